@@ -69,17 +69,72 @@ api_error_threshold = st.sidebar.number_input(
 
 run_simulation = st.sidebar.button("🚀 Run Monitoring Simulation")
 
+
+# ---------------------------
+# CACHED COMPUTATION
+# ---------------------------
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_order_data(end_time: datetime, minutes: int, seed: int) -> pd.DataFrame:
+    """
+    Cached wrapper around generate_order_data.
+    end_time is quantized to the minute by the caller so reruns within
+    the same minute (and same window/seed) hit the cache.
+    """
+    start_time = end_time - timedelta(minutes=minutes)
+    return generate_order_data(start_time, end_time, seed=seed)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_anomalies(
+    df: pd.DataFrame,
+    order_drop_pct: float,
+    delivery_time_threshold: float,
+    payment_fail_threshold: float,
+    api_error_threshold: float
+) -> pd.DataFrame:
+    """
+    Cached wrapper around detect_anomalies, keyed on the data and thresholds.
+    """
+    return detect_anomalies(
+        df,
+        order_drop_pct=order_drop_pct,
+        delivery_time_threshold=delivery_time_threshold,
+        payment_fail_threshold=payment_fail_threshold,
+        api_error_threshold=api_error_threshold
+    )
+
+
+PAGE_SIZE = 50
+
+
+def show_paginated(data: pd.DataFrame, key: str, page_size: int = PAGE_SIZE):
+    """
+    Render one page of a DataFrame; only the visible slice is serialized.
+    Pages are counted back from the end, so the default last page is
+    exactly the most recent page_size rows (like tail(page_size)).
+    """
+    n_pages = max(1, -(-len(data) // page_size))
+    page = n_pages
+    if n_pages > 1:
+        page = st.slider("Page", min_value=1, max_value=n_pages, value=n_pages, key=key)
+    end = len(data) - (n_pages - page) * page_size
+    start = max(0, end - page_size)
+    st.dataframe(data.iloc[start:end], use_container_width=True)
+    if n_pages > 1:
+        st.caption(f"Rows {start + 1}–{end} of {len(data)}")
+
+
 # ---------------------------
 # MAIN LOGIC
 # ---------------------------
 if run_simulation:
-    # Generate synthetic Swiggy-like data
-    end_time = datetime.now()
-    start_time = end_time - timedelta(minutes=minutes)
-    df = generate_order_data(start_time, end_time)
+    # Generate synthetic Swiggy-like data (stable per minute for caching)
+    end_time = datetime.now().replace(second=0, microsecond=0)
+    seed = int(end_time.timestamp()) // 60
+    df = get_order_data(end_time, minutes, seed)
 
     # Detect anomalies
-    anomalies = detect_anomalies(
+    anomalies = get_anomalies(
         df,
         order_drop_pct=order_drop_threshold,
         delivery_time_threshold=delivery_delay_threshold,
@@ -87,52 +142,68 @@ if run_simulation:
         api_error_threshold=api_error_threshold
     )
 
-    # Log anomalies as incidents
+    # Log anomalies as incidents; the cached run is shared by every session, so
+    # replays of the same minute/window/thresholds are deduplicated process-wide
+    run_key = (
+        end_time, minutes, order_drop_threshold, delivery_delay_threshold,
+        payment_failure_threshold, api_error_threshold
+    )
     if not anomalies.empty:
-        incident_log = log_incidents(anomalies)
-    else:
-        incident_log = load_incident_log()
+        log_incidents(anomalies, run_key=run_key)
+
+    # keep the run so widget interactions (e.g. paging) don't clear the dashboard
+    st.session_state["simulation"] = (df, anomalies)
+
+if "simulation" in st.session_state:
+    df, anomalies = st.session_state["simulation"]
+    incident_log = load_incident_log()
 
     # ---------------------------
     # DASHBOARD LAYOUT
     # ---------------------------
     st.subheader("📊 Live KPI Overview")
 
-    latest_row = df.iloc[-1]
+    latest_orders, latest_delivery, latest_payment, latest_api = (
+        df[c].iat[-1]
+        for c in ("orders_per_min", "avg_delivery_time", "payment_failure_rate", "api_error_rate")
+    )
     col1, col2, col3, col4 = st.columns(4)
 
     col1.metric(
         "Current Orders / min",
-        f"{latest_row['orders_per_min']:.0f}"
+        f"{latest_orders:.0f}"
     )
     col2.metric(
         "Avg Delivery Time (min)",
-        f"{latest_row['avg_delivery_time']:.1f}"
+        f"{latest_delivery:.1f}"
     )
     col3.metric(
         "Payment Failure Rate (%)",
-        f"{latest_row['payment_failure_rate']:.2f}"
+        f"{latest_payment:.2f}"
     )
     col4.metric(
         "API Error Rate (%)",
-        f"{latest_row['api_error_rate']:.2f}"
+        f"{latest_api:.2f}"
     )
 
     # Time-series charts
     st.markdown("### 📈 KPI Trends over Time")
 
+    # index once so all charts share the same DatetimeIndex
+    df_indexed = df.set_index("timestamp")
+
     kpi_tab1, kpi_tab2, kpi_tab3, kpi_tab4 = st.tabs(
         ["Orders", "Delivery Time", "Payment Failures", "API Errors"]
     )
 
     with kpi_tab1:
-        st.line_chart(df.set_index("timestamp")["orders_per_min"])
+        st.line_chart(df_indexed["orders_per_min"])
     with kpi_tab2:
-        st.line_chart(df.set_index("timestamp")["avg_delivery_time"])
+        st.line_chart(df_indexed["avg_delivery_time"])
     with kpi_tab3:
-        st.line_chart(df.set_index("timestamp")["payment_failure_rate"])
+        st.line_chart(df_indexed["payment_failure_rate"])
     with kpi_tab4:
-        st.line_chart(df.set_index("timestamp")["api_error_rate"])
+        st.line_chart(df_indexed["api_error_rate"])
 
     # ---------------------------
     # ANOMALIES & INCIDENTS
@@ -143,7 +214,7 @@ if run_simulation:
         st.success("No anomalies detected in the current simulation window 🎉")
     else:
         st.error(f"{len(anomalies)} anomaly/anomalies detected in the current run.")
-        st.dataframe(anomalies, use_container_width=True)
+        show_paginated(anomalies, key="anomalies_page")
 
     st.markdown("### 🧾 Incident Log (Historical)")
 
@@ -151,7 +222,7 @@ if run_simulation:
         st.info("No incidents logged yet. Run the simulation to generate incidents.")
     else:
         st.caption(f"Incident log file: `{INCIDENT_LOG_FILE}`")
-        st.dataframe(incident_log.tail(50), use_container_width=True)
+        show_paginated(incident_log, key="incident_log_page")
 
 else:
     st.info(
@@ -1,63 +1,337 @@
 import os
+import time
+import atexit
+import logging
+import threading
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 
-INCIDENT_LOG_FILE = "incident_log.csv"
+# Parquet dataset directory; each flush adds one part file, and runs of
+# similarly sized recent parts are merged (size-tiered, see _compact)
+INCIDENT_LOG_FILE = "incident_log.parquet"
+LEGACY_INCIDENT_LOG_FILE = "incident_log.csv"
 
+INCIDENT_COLUMNS = [
+    "incident_id",
+    "timestamp",
+    "city",
+    "orders_per_min",
+    "avg_delivery_time",
+    "payment_failure_rate",
+    "api_error_rate",
+    "orders_drop_pct",
+    "alert_type",
+    "severity",
+    "summary",
+    "status",
+    "created_at",
+    "resolution_notes",
+]
 
-def load_incident_log():
+SEVERITY_DTYPE = pd.CategoricalDtype(["MEDIUM", "HIGH", "CRITICAL"], ordered=True)
+
+# low-cardinality columns are held as categoricals in memory; Parquet
+# dictionary-encodes them on disk, so the stored schema stays plain strings
+CATEGORICAL_DTYPES = {
+    "city": "category",
+    "alert_type": "category",
+    "severity": SEVERITY_DTYPE,
+}
+
+INCIDENT_SCHEMA = pa.schema([
+    ("incident_id", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+    ("city", pa.string()),
+    ("orders_per_min", pa.float64()),
+    ("avg_delivery_time", pa.float64()),
+    ("payment_failure_rate", pa.float64()),
+    ("api_error_rate", pa.float64()),
+    ("orders_drop_pct", pa.float64()),
+    ("alert_type", pa.string()),
+    ("severity", pa.string()),
+    ("summary", pa.string()),
+    ("status", pa.string()),
+    ("created_at", pa.timestamp("us")),
+    ("resolution_notes", pa.string()),
+])
+
+# buffered incident rows are flushed once FLUSH_MAX_ROWS are waiting, and
+# otherwise by a timer at most FLUSH_INTERVAL_SECONDS after they arrive
+FLUSH_MAX_ROWS = 32
+FLUSH_INTERVAL_SECONDS = 1.0
+
+# COMPACT_FANOUT parts of the same size tier are merged into one part of the
+# next tier, so each row is rewritten about log_FANOUT(total rows) times
+COMPACT_FANOUT = 8
+
+# run keys already logged by this process (insertion-ordered, oldest evicted)
+LOGGED_RUNS_MAX = 1024
+
+logger = logging.getLogger(__name__)
+
+# pending batches, already converted to INCIDENT_SCHEMA
+_BUFFER: list[pa.Table] = []
+_LAST_FLUSH = time.monotonic()
+_TIMER = None
+_LOGGED_RUNS: dict = {}
+_LOCK = threading.Lock()
+
+
+def _list_parts():
+    return sorted(
+        name for name in os.listdir(INCIDENT_LOG_FILE)
+        if name.endswith(".parquet") and not name.startswith((".", "_"))
+    )
+
+
+@lru_cache(maxsize=64)
+def _read_part(name: str) -> pa.Table:
+    """
+    Read one part file. Parts are immutable once renamed into place
+    (compaction writes a new name), so the file name is a safe cache key.
+    """
+    return pq.read_table(os.path.join(INCIDENT_LOG_FILE, name), schema=INCIDENT_SCHEMA)
+
+
+def _write_table(table: pa.Table):
+    """
+    Add a table to the log as a new Parquet part file.
+    The part is written under a dot-prefixed name (ignored by readers)
+    and renamed into place once complete.
+    """
+    os.makedirs(INCIDENT_LOG_FILE, exist_ok=True)
+    name = f"part-{time.time_ns()}.parquet"
+    tmp_path = os.path.join(INCIDENT_LOG_FILE, f".{name}")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, os.path.join(INCIDENT_LOG_FILE, name))
+
+
+def _to_table(incidents: pd.DataFrame) -> pa.Table:
+    return pa.Table.from_pandas(
+        incidents[INCIDENT_COLUMNS], schema=INCIDENT_SCHEMA, preserve_index=False
+    )
+
+
+@lru_cache(maxsize=64)
+def _part_rows(name: str) -> int:
+    return pq.read_metadata(os.path.join(INCIDENT_LOG_FILE, name)).num_rows
+
+
+def _size_tier(rows: int) -> int:
+    tier = 0
+    while rows >= COMPACT_FANOUT ** (tier + 1):
+        tier += 1
+    return tier
+
+
+def _compact():
+    """
+    Size-tiered compaction: while the newest COMPACT_FANOUT parts share a size
+    tier, merge just those into one part (which lands in a higher tier).
+    Older, larger parts are never rewritten by a small flush, and because only
+    the newest parts are merged the log keeps its chronological part order.
+    The merged part is renamed into place before its inputs are removed.
+    Caller must hold _LOCK.
+    """
+    while True:
+        parts = _list_parts()
+        if len(parts) < COMPACT_FANOUT:
+            return
+        tail = parts[-COMPACT_FANOUT:]
+        tiers = {_size_tier(_part_rows(name)) for name in tail}
+        if len(tiers) != 1:
+            return
+        _write_table(pa.concat_tables([_read_part(name) for name in tail]))
+        for name in tail:
+            os.remove(os.path.join(INCIDENT_LOG_FILE, name))
+
+
+def _migrate_legacy_log():
+    """
+    One-shot conversion of an existing CSV incident log into the Parquet log.
+    The CSV file is left in place. Caller must hold _LOCK.
+    """
+    if os.path.exists(INCIDENT_LOG_FILE) or not os.path.exists(LEGACY_INCIDENT_LOG_FILE):
+        return
+    try:
+        legacy = pd.read_csv(
+            LEGACY_INCIDENT_LOG_FILE, parse_dates=["timestamp", "created_at"]
+        )
+        table = _to_table(legacy)
+    except Exception:
+        return
+    if table.num_rows:
+        _write_table(table)
+
+
+def _flush():
+    """
+    Write all buffered incident rows to the log in one append.
+    If the write fails the rows stay buffered and the error propagates.
+    Caller must hold _LOCK.
+    """
+    global _LAST_FLUSH, _TIMER
+    if _TIMER is not None:
+        _TIMER.cancel()
+        _TIMER = None
+    if _BUFFER:
+        _migrate_legacy_log()
+        _write_table(pa.concat_tables(_BUFFER))
+        _BUFFER.clear()
+        _compact()
+    _LAST_FLUSH = time.monotonic()
+
+
+def _schedule_flush():
+    """
+    Make sure a timer will flush the buffer within FLUSH_INTERVAL_SECONDS.
+    Caller must hold _LOCK.
+    """
+    global _TIMER
+    if _TIMER is None and _BUFFER:
+        _TIMER = threading.Timer(FLUSH_INTERVAL_SECONDS, _timed_flush)
+        _TIMER.daemon = True
+        _TIMER.start()
+
+
+def _try_flush():
+    """
+    Flush from a background path; on failure keep the rows and retry
+    on the timer instead of raising. Caller must hold _LOCK.
+    """
+    try:
+        _flush()
+    except Exception:
+        logger.exception("Failed to write incident log; will retry")
+        _schedule_flush()
+
+
+def _timed_flush():
+    global _TIMER
+    with _LOCK:
+        if _TIMER is threading.current_thread():
+            _TIMER = None
+        _try_flush()
+
+
+def flush_incidents():
+    """
+    Persist any buffered incidents immediately.
+    """
+    with _LOCK:
+        _flush()
+
+
+atexit.register(flush_incidents)
+
+
+def _with_categoricals(incidents: pd.DataFrame) -> pd.DataFrame:
+    return incidents.astype(CATEGORICAL_DTYPES)
+
+
+def _read_incident_log():
+    _migrate_legacy_log()
     if not os.path.exists(INCIDENT_LOG_FILE):
         return None
     try:
-        return pd.read_csv(INCIDENT_LOG_FILE, parse_dates=["timestamp"])
+        parts = _list_parts()
+        if not parts:
+            return None
+        # only parts written since the last load are read from disk
+        return pa.concat_tables([_read_part(name) for name in parts]).to_pandas()
     except Exception:
         return None
 
 
-def log_incidents(anomalies: pd.DataFrame) -> pd.DataFrame:
+def load_incident_log():
+    """
+    Load the incident log, including rows still waiting in the write buffer.
+    """
+    with _LOCK:
+        incident_log = _read_incident_log()
+        pending = pa.concat_tables(_BUFFER).to_pandas() if _BUFFER else None
+
+    if pending is None:
+        return None if incident_log is None else _with_categoricals(incident_log)
+    if incident_log is None or incident_log.empty:
+        return _with_categoricals(pending)
+    return _with_categoricals(pd.concat([incident_log, pending], ignore_index=True))
+
+
+def _claim_run(run_key) -> bool:
     """
-    Append anomalies as incident rows into the incident_log.csv file.
+    Record run_key as logged; False if it was already logged by this process.
+    """
+    with _LOCK:
+        if run_key in _LOGGED_RUNS:
+            return False
+        _LOGGED_RUNS[run_key] = None
+        if len(_LOGGED_RUNS) > LOGGED_RUNS_MAX:
+            del _LOGGED_RUNS[next(iter(_LOGGED_RUNS))]
+        return True
+
+
+def _release_run(run_key):
+    with _LOCK:
+        _LOGGED_RUNS.pop(run_key, None)
+
+
+def log_incidents(anomalies: pd.DataFrame, run_key=None) -> pd.DataFrame:
+    """
+    Append anomalies as incident rows into the incident_log.parquet dataset.
+    Rows are buffered and written in batches (see FLUSH_MAX_ROWS and
+    FLUSH_INTERVAL_SECONDS); call flush_incidents() to force a write.
+    If run_key is given, a run with the same key is logged only once per
+    process, however many sessions replay it.
     """
     if anomalies is None or anomalies.empty:
         return load_incident_log()
+    if run_key is not None and not _claim_run(run_key):
+        return load_incident_log()
 
     incident_log = load_incident_log()
     new_incidents = anomalies.copy()
 
-    # Add standard incident fields
-    new_incidents["incident_id"] = [
-        f"INC-{datetime.now().strftime('%Y%m%d%H%M%S')}-{i}"
-        for i in range(len(new_incidents))
-    ]
+    # Add standard incident fields (one timestamp shared by the whole batch)
+    now = datetime.now()
+    prefix = f"INC-{now:%Y%m%d%H%M%S}-"
+    new_incidents["incident_id"] = prefix + pd.Index(np.arange(len(new_incidents))).astype(str)
     new_incidents["status"] = "OPEN"
-    new_incidents["created_at"] = datetime.now()
+    new_incidents["created_at"] = now
 
     # Example resolution note placeholder (can be updated later manually)
     new_incidents["resolution_notes"] = "Pending RCA and resolution."
 
-    cols_order = [
-        "incident_id",
-        "timestamp",
-        "city",
-        "orders_per_min",
-        "avg_delivery_time",
-        "payment_failure_rate",
-        "api_error_rate",
-        "orders_drop_pct",
-        "alert_type",
-        "severity",
-        "summary",
-        "status",
-        "created_at",
-        "resolution_notes",
-    ]
-
-    new_incidents = new_incidents[cols_order]
+    new_incidents = _with_categoricals(new_incidents[INCIDENT_COLUMNS])
+
+    # convert up front so a bad batch fails this call instead of every flush
+    try:
+        batch = _to_table(new_incidents)
+    except Exception:
+        if run_key is not None:
+            _release_run(run_key)
+        raise
 
     if incident_log is None or incident_log.empty:
         combined = new_incidents
     else:
-        combined = pd.concat([incident_log, new_incidents], ignore_index=True)
+        # categories can differ between batches; re-apply after concatenating
+        combined = _with_categoricals(
+            pd.concat([incident_log, new_incidents], ignore_index=True)
+        )
+
+    with _LOCK:
+        _BUFFER.append(batch)
+        if (
+            sum(table.num_rows for table in _BUFFER) >= FLUSH_MAX_ROWS
+            or time.monotonic() - _LAST_FLUSH > FLUSH_INTERVAL_SECONDS
+        ):
+            _try_flush()
+        else:
+            _schedule_flush()
 
-    combined.to_csv(INCIDENT_LOG_FILE, index=False)
     return combined
@@ -1,60 +1,185 @@
 import pandas as pd
 import numpy as np
 from datetime import timedelta
-import random
+from numba import njit
 
 CITIES = ["Bangalore", "Hyderabad", "Chennai", "Mumbai", "Pune"]
 
-
-def generate_order_data(start_time, end_time, freq="1min"):
+# anomaly type -> (column, factor range, number of affected rows)
+ANOMALY_SPECS = {
+    "orders_drop": ("orders_per_min", (0.1, 0.4), 4),
+    "delivery_spike": ("avg_delivery_time", (1.5, 2.5), 6),
+    "payment_spike": ("payment_failure_rate", (3, 5), 4),
+    "api_spike": ("api_error_rate", (3, 6), 4),
+}
+
+# alert checks, in bit order of the alert bitmask built by _detect_kernel
+# (order drop, delivery time, payment failures, API errors):
+# (alert tag, severity weight, summary text)
+ALERT_CHECKS = [
+    ("ORDER_VOLUME_DROP", 2, "Orders dropped vs baseline"),
+    ("DELIVERY_DELAY", 2, "Delivery time spiked"),
+    ("PAYMENT_FAILURE_SPIKE", 3, "Payment failures spiked"),
+    ("API_ERROR_SPIKE", 3, "API errors spiked"),
+]
+ALERT_WEIGHTS = np.array([weight for _, weight, _ in ALERT_CHECKS])
+
+
+@njit(cache=True)
+def rolling_mean(a, window, min_periods):
+    """
+    Trailing rolling mean using a running sum (one add/subtract per step).
+    Matches Series.rolling(window, min_periods=min_periods).mean().
+    """
+    n = a.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    s = 0.0
+    cnt = 0
+    for i in range(n):
+        x = a[i]
+        if not np.isnan(x):
+            s += x
+            cnt += 1
+        if i >= window:
+            old = a[i - window]
+            if not np.isnan(old):
+                s -= old
+                cnt -= 1
+        out[i] = s / cnt if cnt >= min_periods and cnt > 0 else np.nan
+    return out
+
+
+# serial on purpose: inputs are a few hundred rows, and parallel kernels
+# launched from Streamlit's script thread hang interpreter exit under TBB
+@njit(cache=True)
+def _detect_kernel(orders, delivery, payment, api, rolling, thresholds, weights):
+    """
+    Fused threshold pass over all KPIs in ALERT_CHECKS order.
+    Returns (mask, score, bits) where bit j of bits[i] is set when
+    check j fires for row i and score[i] is the weighted sum of fired checks.
+    """
+    n = orders.shape[0]
+    mask = np.zeros(n, dtype=np.bool_)
+    score = np.zeros(n, dtype=np.int64)
+    bits = np.zeros(n, dtype=np.uint8)
+    for i in range(n):
+        b = 0
+        s = 0
+        r = rolling[i]
+        # NaN baselines (warm-up rows) never compare greater
+        if r != 0 and (r - orders[i]) / r * 100 > thresholds[0]:
+            b |= 1
+            s += weights[0]
+        if delivery[i] > thresholds[1]:
+            b |= 2
+            s += weights[1]
+        if payment[i] > thresholds[2]:
+            b |= 4
+            s += weights[2]
+        if api[i] > thresholds[3]:
+            b |= 8
+            s += weights[3]
+        bits[i] = b
+        score[i] = s
+        mask[i] = b != 0
+    return mask, score, bits
+
+
+def generate_order_data(start_time, end_time, freq="1min", seed=None):
     """
     Generate synthetic Swiggy-like order data between start_time and end_time.
+    Pass a seed for reproducible output.
     """
-    timestamps = pd.date_range(start=start_time, end=end_time, freq=freq)
+    start = pd.Timestamp(start_time)
+    if freq == "1min" and start.tz is None:
+        # fixed 1-minute grid: skip the DateOffset machinery of pd.date_range
+        n = max(int((pd.Timestamp(end_time) - start) // pd.Timedelta(minutes=1)) + 1, 0)
+        timestamps = pd.DatetimeIndex(
+            start.to_datetime64() + np.arange(n) * np.timedelta64(1, "m")
+        )
+    else:
+        timestamps = pd.date_range(start=start_time, end=end_time, freq=freq)
     n = len(timestamps)
 
-    # base patterns
-    base_orders = np.random.randint(80, 150, size=n).astype(float)
-    base_delivery_time = np.random.normal(loc=35, scale=5, size=n)
-    base_payment_failure = np.random.uniform(0.5, 3.0, size=n)  # %
-    base_api_error_rate = np.random.uniform(0.1, 1.5, size=n)   # %
+    rng = np.random.default_rng(seed)
 
-    # occasionally inject anomalies
-    df = pd.DataFrame({
-        "timestamp": timestamps,
+    # base patterns (float32 halves the bytes moved by downstream passes)
+    base_orders = rng.integers(80, 150, size=n).astype(np.float32)
+    base_delivery_time = rng.normal(loc=35, scale=5, size=n).astype(np.float32)
+    base_payment_failure = rng.uniform(0.5, 3.0, size=n).astype(np.float32)  # %
+    base_api_error_rate = rng.uniform(0.1, 1.5, size=n).astype(np.float32)   # %
+    cities = rng.choice(CITIES, size=n)
+
+    columns = {
         "orders_per_min": base_orders,
         "avg_delivery_time": base_delivery_time,
         "payment_failure_rate": base_payment_failure,
         "api_error_rate": base_api_error_rate,
-    })
+    }
 
-    # assign random city per row (simplified)
-    df["city"] = np.random.choice(CITIES, size=n)
-
-    # inject some spikes/drops
-    for _ in range(3):
-        idx = np.random.randint(0, n)
-        # random type of anomaly
-        anomaly_type = random.choice(["orders_drop", "delivery_spike", "payment_spike", "api_spike"])
-
-        if anomaly_type == "orders_drop":
-            df.loc[idx: idx + 3, "orders_per_min"] *= np.random.uniform(0.1, 0.4)
-        elif anomaly_type == "delivery_spike":
-            df.loc[idx: idx + 5, "avg_delivery_time"] *= np.random.uniform(1.5, 2.5)
-        elif anomaly_type == "payment_spike":
-            df.loc[idx: idx + 3, "payment_failure_rate"] *= np.random.uniform(3, 5)
-        elif anomaly_type == "api_spike":
-            df.loc[idx: idx + 3, "api_error_rate"] *= np.random.uniform(3, 6)
+    # occasionally inject spikes/drops directly on the raw arrays
+    starts = rng.integers(0, n, size=3)
+    anomaly_types = rng.choice(list(ANOMALY_SPECS), size=3)
+    for idx, anomaly_type in zip(starts, anomaly_types):
+        col, (low, high), span = ANOMALY_SPECS[anomaly_type]
+        columns[col][idx: idx + span] *= rng.uniform(low, high)
 
     # make sure no negative values
-    df["orders_per_min"] = df["orders_per_min"].clip(lower=0)
-    df["avg_delivery_time"] = df["avg_delivery_time"].clip(lower=0)
-    df["payment_failure_rate"] = df["payment_failure_rate"].clip(lower=0)
-    df["api_error_rate"] = df["api_error_rate"].clip(lower=0)
+    for arr in columns.values():
+        np.maximum(arr, np.float32(0), out=arr)
+
+    df = pd.DataFrame({"timestamp": timestamps, **columns}, copy=False)
+
+    # assign random city per row (simplified)
+    df["city"] = pd.Categorical(cities, categories=CITIES)
 
     return df
 
 
+def _may_have_anomalies(
+    df: pd.DataFrame,
+    order_drop_pct: float,
+    delivery_time_threshold: float,
+    payment_fail_threshold: float,
+    api_error_threshold: float
+) -> bool:
+    """
+    Cheap per-column max/min screen run before the full detection pass.
+    Never returns False when detect_anomalies would flag a row.
+    """
+    if len(df) == 0:
+        return False
+
+    # fmax/fmin reductions skip NaNs, so a NaN cannot hide a spike; results go
+    # through float() so comparisons run in float64 like _detect_kernel
+    # (a float32 scalar would pull the threshold down to float32)
+    for col, threshold in (
+        ("avg_delivery_time", delivery_time_threshold),
+        ("payment_failure_rate", payment_fail_threshold),
+        ("api_error_rate", api_error_threshold),
+    ):
+        if float(np.fmax.reduce(df[col].to_numpy())) > threshold:
+            return True
+
+    # the rolling baseline always lies within [min, max] of the orders, so a
+    # drop is impossible unless the minimum falls below the bound on baseline*(1-pct)
+    orders = df["orders_per_min"].to_numpy()
+    lo, hi = float(np.fmin.reduce(orders)), float(np.fmax.reduce(orders))
+    if np.isnan(lo):
+        return False
+    if lo < 0:
+        # negative baselines flip the drop inequality; don't screen
+        return True
+    keep = 1 - order_drop_pct / 100
+    return lo < max(lo * keep, hi * keep)
+
+
+def _empty_anomalies(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(columns=list(df.columns) + [
+        "rolling_orders", "orders_drop_pct", "alert_type", "severity", "summary"
+    ])
+
+
 def detect_anomalies(
     df: pd.DataFrame,
     order_drop_pct: float,
@@ -66,82 +191,54 @@ def detect_anomalies(
     Detect anomalies based on simple thresholds and rolling stats.
     Returns subset of df with additional 'alert_type' and 'severity'.
     """
-    df = df.copy()
-    df["rolling_orders"] = df["orders_per_min"].rolling(window=30, min_periods=10).mean()
-    df["orders_drop_pct"] = (
-        (df["rolling_orders"] - df["orders_per_min"]) / df["rolling_orders"].replace(0, np.nan)
-    ) * 100
-
-    conditions = []
-
-    # Order volume drop
-    cond_orders = df["orders_drop_pct"] > order_drop_pct
-    if cond_orders.any():
-        df.loc[cond_orders, "alert_type"] = df.get("alert_type", "") + "ORDER_VOLUME_DROP;"
-        conditions.append(cond_orders)
-
-    # Delivery time spike
-    cond_delivery = df["avg_delivery_time"] > delivery_time_threshold
-    if cond_delivery.any():
-        df.loc[cond_delivery, "alert_type"] = df.get("alert_type", "") + "DELIVERY_DELAY;"
-        conditions.append(cond_delivery)
-
-    # Payment failure spike
-    cond_payment = df["payment_failure_rate"] > payment_fail_threshold
-    if cond_payment.any():
-        df.loc[cond_payment, "alert_type"] = df.get("alert_type", "") + "PAYMENT_FAILURE_SPIKE;"
-        conditions.append(cond_payment)
-
-    # API error spike
-    cond_api = df["api_error_rate"] > api_error_threshold
-    if cond_api.any():
-        df.loc[cond_api, "alert_type"] = df.get("alert_type", "") + "API_ERROR_SPIKE;"
-        conditions.append(cond_api)
-
-    if not conditions:
-        return pd.DataFrame(columns=list(df.columns) + ["severity", "summary"])
-
-    combined = conditions[0]
-    for c in conditions[1:]:
-        combined |= c
-
-    anomalies = df[combined].copy()
+    thresholds = (
+        order_drop_pct, delivery_time_threshold, payment_fail_threshold, api_error_threshold
+    )
+    if not _may_have_anomalies(df, *thresholds):
+        return _empty_anomalies(df)
+
+    orders = df["orders_per_min"].to_numpy()
+    rolling_orders = rolling_mean(orders, 30, 10)
+    thresholds = np.array(thresholds, dtype=np.float64)
+
+    # one fused pass computes every check, the severity score and alert bits
+    any_row, score, bits = _detect_kernel(
+        orders,
+        df["avg_delivery_time"].to_numpy(),
+        df["payment_failure_rate"].to_numpy(),
+        df["api_error_rate"].to_numpy(),
+        rolling_orders,
+        thresholds,
+        ALERT_WEIGHTS,
+    )
+
+    if not any_row.any():
+        return _empty_anomalies(df)
+
+    # derived series are only materialized for the flagged rows
+    rolling_sel = rolling_orders[any_row]
+    baseline = np.where(rolling_sel == 0, np.nan, rolling_sel)
+    anomalies = df.iloc[any_row].assign(
+        rolling_orders=rolling_sel,
+        orders_drop_pct=(rolling_sel - orders[any_row]) / baseline * 100,
+    )
+    score = score[any_row]
+    bits = bits[any_row]
+
+    # alert tags and human-readable summary for incident report
+    tags = np.full(len(anomalies), "", dtype=object)
+    summary = np.full(len(anomalies), "", dtype=object)
+    for j, (tag, _, text) in enumerate(ALERT_CHECKS):
+        mask = (bits & (1 << j)) != 0
+        tags[mask] = tags[mask] + tag + ";"
+        summary[mask] = np.where(summary[mask] == "", text, summary[mask] + ", " + text)
+    anomalies["alert_type"] = tags
+    anomalies["summary"] = summary
 
     # Simple severity tagging
-    def classify_severity(row):
-        score = 0
-        if "ORDER_VOLUME_DROP" in str(row.get("alert_type", "")):
-            score += 2
-        if "DELIVERY_DELAY" in str(row.get("alert_type", "")):
-            score += 2
-        if "PAYMENT_FAILURE_SPIKE" in str(row.get("alert_type", "")):
-            score += 3
-        if "API_ERROR_SPIKE" in str(row.get("alert_type", "")):
-            score += 3
-
-        if score >= 6:
-            return "CRITICAL"
-        elif score >= 3:
-            return "HIGH"
-        else:
-            return "MEDIUM"
-
-    anomalies["severity"] = anomalies.apply(classify_severity, axis=1)
-
-    # human-readable summary for incident report
-    def summarize(row):
-        parts = []
-        if "ORDER_VOLUME_DROP" in str(row["alert_type"]):
-            parts.append("Orders dropped vs baseline")
-        if "DELIVERY_DELAY" in str(row["alert_type"]):
-            parts.append("Delivery time spiked")
-        if "PAYMENT_FAILURE_SPIKE" in str(row["alert_type"]):
-            parts.append("Payment failures spiked")
-        if "API_ERROR_SPIKE" in str(row["alert_type"]):
-            parts.append("API errors spiked")
-        return ", ".join(parts)
-
-    anomalies["summary"] = anomalies.apply(summarize, axis=1)
+    anomalies["severity"] = np.select(
+        [score >= 6, score >= 3], ["CRITICAL", "HIGH"], default="MEDIUM"
+    )
 
     return anomalies[[
         "timestamp", "city", "orders_per_min", "avg_delivery_time",